@@ -14,6 +14,7 @@ from pathlib import Path
 
 import importlib.resources as pkg_resources
 from . import boilerplates
+from physprep.utils import TSV_GZ_COMPRESSION
 
 
 
@@ -60,10 +61,14 @@ def create_bids_dataset(path, nb_sub=1, nb_ses=1, nb_run=1, duration=60, samplin
         for ses in range(nb_ses):
             # Create ses id
             ses_id = '0'*(3-len(str(nb_ses))) + str(ses+1)
+            # Create subdirectories, shared by all the runs of the session
+            path_tmp = path / f'sub-{sub_id}' / f'ses-{ses_id}' / concurrent_with
+            path_tmp.mkdir(parents=True, exist_ok=True)
             for run in range(nb_run):
                 run_id = '0'*(2-len(str(nb_run))) + str(run+1)
-                # Instantiate empty DataFrame and empty dictionary
-                data = pd.DataFrame()
+                # Instantiate empty dictionaries, the timeseries are gathered before
+                # building the DataFrame in one go
+                data = {}
                 metadata = {}
                 cols = []
 
@@ -114,21 +119,19 @@ def create_bids_dataset(path, nb_sub=1, nb_ses=1, nb_run=1, duration=60, samplin
                             random_state=0
                         )
                         cols.append('EDA')
-                
-                # Create subdirectories
-                path_tmp = path / f'sub-{sub_id}' / f'ses-{ses_id}' / concurrent_with 
-                path_tmp.mkdir(parents=True, exist_ok=True)
+                data = pd.DataFrame(data)
+
+                filename = f'sub-{sub_id}_ses-{ses_id}_task-test_run-{run_id}_physio'
                 # Save timeseries
-                data.to_csv(path / f'sub-{sub_id}' / f'ses-{ses_id}' / concurrent_with / f'sub-{sub_id}_ses-{ses_id}_task-test_run-{run_id}_physio.tsv.gz', sep='\t')
+                data.to_csv(path_tmp / f'{filename}.tsv.gz', sep='\t', compression=TSV_GZ_COMPRESSION)
                 # Save related metadata
                 metadata.update(
                     {
                         'Columns':cols
                     }
                 )
-                with open(path / f'sub-{sub_id}' / f'ses-{ses_id}' / concurrent_with / f'sub-{sub_id}_ses-{ses_id}_task-test_run-{run_id}_physio.json', "w") as f:
+                with open(path_tmp / f'{filename}.json', "w") as f:
                     json.dump(metadata, f, indent=4)
-                    f.close()
     
     # Saving the dataset_description.json file at the root of `path`
     with pkg_resources.files(boilerplates).joinpath('dataset_description.json').open('rb') as template_file:
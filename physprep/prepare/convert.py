@@ -192,11 +192,16 @@ def validate_segmentation(segmented_file, tr, thr):
     path_dir = os.path.dirname(segmented_file)
     tmp_filename = os.path.basename(segmented_file).split('.')[0]
     metadata = utils.load_json(os.path.join(path_dir, f"{tmp_filename}.json"))
-    tmp = pd.read_csv(segmented_file, sep='\t', names=metadata['Columns'])
+    # Only the trigger is needed to check the segmentation, the other channels are
+    # parsed only if the run has to be segmented again
+    trigger = pd.read_csv(
+        segmented_file, sep='\t', names=metadata['Columns'], usecols=['trigger']
+    )['trigger']
 
-    if len(tmp[tmp['trigger']>thr])/metadata['SamplingFrequency'] > tr[0]:
+    if (trigger > thr).sum()/metadata['SamplingFrequency'] > tr[0]:
         print(f'Invalid segmentationfor {tmp_filename}')
         print('Redoing segmentation...')
+        tmp = pd.read_csv(segmented_file, sep='\t', names=metadata['Columns'])
         # Segmenting the timeseries based on the thr value
         tmp['tmp'] = (tmp['trigger'] > thr).astype(int).diff().ne(0).cumsum()
         segments = [group for group, group_df in tmp[tmp['trigger'] > thr].groupby('tmp')]
@@ -212,5 +217,11 @@ def validate_segmentation(segmented_file, tr, thr):
             tmp['time'] = tmp['time']-tmp['time'].iloc[0]
             metadata['StartTime'] = tmp['time'].iloc[0]
             # Saving properly segmented run
-            tmp.to_csv(os.path.join(path_dir, f"{tmp_filename}.tsv.gz"), sep='\t', index=False, header=None)
+            tmp.to_csv(
+                os.path.join(path_dir, f"{tmp_filename}.tsv.gz"),
+                sep='\t',
+                index=False,
+                header=None,
+                compression=utils.TSV_GZ_COMPRESSION,
+            )
             json.dump(metadata, open(os.path.join(path_dir, f"{tmp_filename}.json"), 'w'), indent=4)
\ No newline at end of file
@@ -11,8 +11,7 @@ import os
 import numpy as np
 import pandas as pd
 import pprintpp
-from bioread import read_file
-from neurokit2 import read_acqknowledge
+from bioread import read_file, read_headers
 
 from physprep.prepare.list_sub import list_sub
 from physprep.utils import _check_bids_validity, load_json
@@ -33,15 +32,18 @@ def order_channels(acq_channels, metadata_physio):
     """
     ch_names = []
     chsel = []
+    # map each channel defined in the configuration file to its key
+    ch_to_key = {
+        metadata_physio[key]["Channel"]: key
+        for key in metadata_physio
+        if key != "concurrentWith"
+    }
     for idx, channel in enumerate(acq_channels):
-        found = False
-        for key in metadata_physio:
-            if key != "concurrentWith":
-                if channel == metadata_physio[key]["Channel"]:
-                    ch_names.append(key)
-                    chsel.append(idx + 1)
-                    found = True
-        if not found:
+        key = ch_to_key.get(channel)
+        if key is not None:
+            ch_names.append(key)
+            chsel.append(idx + 1)
+        else:
             ch_names.append(channel)
 
     if len(chsel) == 0:
@@ -53,6 +55,32 @@ def order_channels(acq_channels, metadata_physio):
     return ch_names, chsel
 
 
+def trigger_samples(channel, thr=4):
+    """
+    Get the indexes of the samples above a threshold in a trigger channel.
+
+    The threshold is converted to the channel raw units, so the comparison is
+    done on the raw (usually int16) samples instead of the scaled float values.
+
+    Parameters
+    ----------
+    channel : bioread.biopac.Channel
+        Trigger channel, with its data loaded.
+    thr : float
+        Threshold, in the channel units (e.g. V).
+        Default to 4.
+
+    Returns
+    -------
+    session : np.ndarray
+        Indexes of the samples above `thr`.
+    """
+    thr_raw = (thr - channel.raw_offset) / channel.raw_scale_factor
+    if channel.raw_scale_factor < 0:
+        return np.flatnonzero(channel.raw_data < thr_raw)
+    return np.flatnonzero(channel.raw_data > thr_raw)
+
+
 def volume_counter(root, sub, metadata_physio, ses=None, tr=1.49, trigger_ch="TTL"):
     """
     Volume counting for each run in a session.
@@ -107,20 +135,23 @@ def volume_counter(root, sub, metadata_physio, ses=None, tr=1.49, trigger_ch="TT
                 path_to_file = os.path.join(root, sub, file)
             else:
                 path_to_file = os.path.join(root, sub, exp, file)
-            bio_df, fs = read_acqknowledge(path_to_file)
-            print(bio_df)
+            # only the headers are needed to get the channel names
+            bio_columns = [
+                channel.name for channel in read_headers(path_to_file).channels
+            ]
             # find the correct index of Trigger channel
-            if trigger_ch in bio_df.columns:
-                trigger_index = list(bio_df.columns).index(trigger_ch)
-                # initialize a df with TTL values over 4 (switch either ~0 or ~5)
-            else:
-                trigger_index = list(bio_df.columns).index("TTL")
-                # initialize a df with TTL values over 4 (switch either ~0 or ~5)
-            query_df = bio_df[bio_df[bio_df.columns[trigger_index]] > 4]
+            trigger_index = bio_columns.index(
+                trigger_ch if trigger_ch in bio_columns else "TTL"
+            )
+            # only the trigger channel is loaded to locate the TTL values over 4
+            # (switch either ~0 or ~5)
+            trigger = read_file(path_to_file, channel_indexes=[trigger_index]).channels[
+                trigger_index
+            ]
+            fs = trigger.samples_per_second
 
-            # Define session length - this list will be less
-            # memory expensive to play with than dataframe
-            session = list(query_df.index)
+            # Define session length - sample indexes of the triggers
+            session = trigger_samples(trigger, thr=4)
 
             # maximal TR - the time distance between two adjacent TTL, now
             # given by the ceiling value of the tr (but might be tweaked if
@@ -128,63 +159,40 @@ def volume_counter(root, sub, metadata_physio, ses=None, tr=1.49, trigger_ch="TT
             tr_period = fs * math.ceil(tr)
 
             # Define session length and adjust with padding
-            try:
-                start = int(session[0])
-            except IndexError:
+            if session.size == 0:
                 LGR.info(f"No trigger channel input apparently; skipping {file}")
-                return "No trigger input", bio_df.columns
+                # keep a place holder and carry on with the other files
+                ses_runs.setdefault(exp, []).append("No trigger input")
                 continue
+            start = int(session[0])
             end = int(session[-1])
 
-            # initialize list of sample index to compute nb of volumes per run
-            parse_list = []
-
-            # ascertain that session is longer than 3 min
-            for idx in range(1, len(session)):
-                # define time diff between current successive trigger
-                time_delta = session[idx] - session[idx - 1]
-
-                # if the time diff between two trigger values over 4
-                # is larger than TR, keep both indexes
-                if time_delta > tr_period:
-                    parse_start = int(session[idx - 1])
-                    parse_end = int(session[idx])
-                    # adjust the segmentation with padding
-                    # parse start is end of run
-                    parse_list += [(parse_start, parse_end)]
-            if len(parse_list) == 0:
+            # if the time diff between two successive trigger values over 4
+            # is larger than TR, the first one ends a run and the second one
+            # starts the next run
+            edges = np.flatnonzero(np.diff(session) > tr_period)
+            if edges.size == 0:
                 runs = round((end - start) / fs / tr + 1)
                 if exp not in ses_runs:
                     ses_runs[exp] = [runs]
                 else:
                     ses_runs[exp].append([runs])
                 continue
-            # Create tuples with the given indexes
-            # First block is always from first trigger to first parse
-            block1 = (start, parse_list[0][0])
-
-            # runs is a list of tuples specifying runs in the session
-            runs = []
-            # push the resulting tuples (run_start, run_end)
-            runs.append(block1)
-            for i in range(0, len(parse_list)):
-                try:
-                    runs.append((parse_list[i][1], parse_list[1 + i][0]))
-
-                except IndexError:
-                    runs.append((parse_list[i][1], end))
+            # First block is always from first trigger to first parse, and the
+            # last block from the last parse to the last trigger
+            run_starts = np.concatenate(([start], session[edges + 1]))
+            run_ends = np.concatenate((session[edges], [end]))
 
             # compute the number of trigger/volumes in the run
-            for i in range(0, len(runs)):
-                runs[i] = round(((runs[i][1] - runs[i][0]) / fs) / tr) + 1
+            runs = (np.round((run_ends - run_starts) / fs / tr).astype(int) + 1).tolist()
             if exp not in ses_runs:
                 ses_runs[exp] = [runs]
             else:
                 ses_runs[exp].append(runs)
 
-    ch_names, chsel = order_channels(bio_df.columns, metadata_physio)
+    ch_names, chsel = order_channels(bio_columns, metadata_physio)
 
-    LGR.info(f"Volumes for session :\n{ses_runs}")
+    LGR.info("Volumes for session :\n%s", ses_runs)
     return ses_runs, ch_names, chsel
 
 
@@ -228,7 +236,7 @@ def duration_counter(trigger_ch, sampling_rate, thr=5):
     return runs
 
 
-def get_info(root, sub, workflow, ses=None, count_vol=False):
+def get_info(root, sub, workflow, ses=None, count_vol=False, show=True):
     """
     Get all volumes taken for a sub.
     `get_info` pushes the info necessary to execute the phys2bids multi-run
@@ -247,6 +255,9 @@ def get_info(root, sub, workflow, ses=None, count_vol=False):
     count_vol : bool
         Specify if you want to count triggers in physio file.
         Default to False.
+    show : bool
+        Print the info of all the sessions once they are gathered.
+        Default to True.
 
     Returns
     -------
@@ -327,7 +338,6 @@ def get_info(root, sub, workflow, ses=None, count_vol=False):
         # iterate through matches (concurrent recordings)
         for idx, match in enumerate(list_matches):
             entities = match.get_entities()
-            metadata = match.get_metadata()
             concurrent_file.append(match.filename)
 
             if entities["datatype"] == "eeg":
@@ -350,6 +360,7 @@ def get_info(root, sub, workflow, ses=None, count_vol=False):
             else:
                 # we want to have the TR in a _bold.json to later use it in the
                 # volume_counter function
+                metadata = match.get_metadata()
                 # Check if metadata are there
                 if not metadata:
                     LGR.info(f"No metadata to match : {exp}")
@@ -365,7 +376,7 @@ def get_info(root, sub, workflow, ses=None, count_vol=False):
                     LGR.info("Cannot access Nifti BIDS metadata")
 
         # print the thing to show progress
-        LGR.info(f"BIDS metadata; number of volumes per run:\n{nb_expected_volumes_run}")
+        LGR.info("BIDS metadata; number of volumes per run:\n%s", nb_expected_volumes_run)
         # push all info in run in dict
         nb_expected_runs[exp] = {}
         # the nb of expected volumes in each run of the session (embedded dict)
@@ -385,6 +396,7 @@ def get_info(root, sub, workflow, ses=None, count_vol=False):
 
         if count_vol:
             ls_run_dict, ls_ch_names, ls_chsel = [], [], []
+            session_counts = None
             # check if biopac file exist, notify the user that we won't
             # count volumes
             try:
@@ -434,17 +446,24 @@ def get_info(root, sub, workflow, ses=None, count_vol=False):
                                     f"file for: {exp}"
                                 )
                             else:
-                                vol_in_biopac, ch_names, chsel = volume_counter(
-                                    os.path.join(layout.root, f"sourcedata/{modality}/"),
-                                    sub,
-                                    workflow,
-                                    ses=exp,
-                                    tr=tr,
-                                    trigger_ch=workflow["trigger"]["Channel"],
-                                )
-                                LGR.info(
-                                    f"finished counting volumes in physio file for: {exp}"
-                                )
+                                # volume_counter reads every physio file of the
+                                # session, so only run it once per session
+                                if session_counts is None:
+                                    session_counts = volume_counter(
+                                        os.path.join(
+                                            layout.root, f"sourcedata/{modality}/"
+                                        ),
+                                        sub,
+                                        workflow,
+                                        ses=exp,
+                                        tr=tr,
+                                        trigger_ch=workflow["trigger"]["Channel"],
+                                    )
+                                    LGR.info(
+                                        "finished counting volumes in physio file "
+                                        f"for: {exp}"
+                                    )
+                                vol_in_biopac, ch_names, chsel = session_counts
                             try:
                                 run_dict.update(
                                     {f"run-{idx_n+1:02d}": vol_in_biopac[exp]}
@@ -473,13 +492,15 @@ def get_info(root, sub, workflow, ses=None, count_vol=False):
                 LGR.info(f"skipping :{exp} for task {name}")
         print("~" * 80)
 
-    pprintpp.pprint(nb_expected_runs)
+    # only pretty-format the whole dict if it is going to be shown
+    if show:
+        pprintpp.pprint(nb_expected_runs)
 
-    if os.path.exists(os.path.join(root, 'code', sub)) is False:
-        os.mkdir(os.path.join(root, 'code', sub))
+    outdir = os.path.join(root, 'code', sub)
+    os.makedirs(outdir, exist_ok=True)
     filename = f"{sub}_sessions.json"
-    with open(os.path.join(root, 'code', sub, filename), "w") as f:
-        json.dump(nb_expected_runs, f, indent=4)
+    with open(os.path.join(outdir, filename), "w") as f:
+        f.write(json.dumps(nb_expected_runs, indent=4))
 
     return nb_expected_runs
 
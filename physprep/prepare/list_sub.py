@@ -11,6 +11,26 @@ import pprintpp
 LGR = logging.getLogger(__name__)
 
 
+def _list_files(path, ext):
+    """
+    List the files with a given extension in a directory.
+
+    Arguments
+    ---------
+    path : str
+        Directory to scan.
+    ext : str
+        Extension of the files to keep.
+
+    Returns
+    -------
+    file_list : list
+        Names of the files ending with `ext`.
+    """
+    with os.scandir(path) as entries:
+        return [entry.name for entry in entries if entry.name.endswith(ext)]
+
+
 def list_sub(root, sub, ses=None, ext=".acq", save=None, show=False):
     """
     List a subject's files.
@@ -62,15 +82,16 @@ def list_sub(root, sub, ses=None, ext=".acq", save=None, show=False):
         raise ValueError("Couldn't find the subject's path \n", os.path.join(root, sub))
     file_list = []
     ses_runs = {}
-    ses_list = os.listdir(path_sub)
+    # scan the subject's directory only once, the entries are reused below
+    with os.scandir(path_sub) as entries:
+        ses_entries = list(entries)
+    ses_list = [entry.name for entry in ses_entries]
     # list files in only one session
     if ses is not None:
         dir = os.path.join(path_sub, ses)
         # if the path exists, list .acq files
         if os.path.exists(dir):
-            for filename in os.listdir(dir):
-                if filename.endswith(ext):
-                    file_list += [filename]
+            file_list = _list_files(dir, ext)
             if show:
                 print("list of sessions in subjet's directory: ", ses_list)
                 print("list of files in the session:", file_list)
@@ -91,19 +112,12 @@ def list_sub(root, sub, ses=None, ext=".acq", save=None, show=False):
             raise Exception("Session path you gave does not exist")
 
     # list files in all sessions (or here, exp for experiments)
-    elif os.path.isdir(os.path.join(path_sub, ses_list[0])) is True:
-        for exp in ses_list:
-            if exp.endswith(".json"):
+    elif ses_entries[0].is_dir():
+        for entry in ses_entries:
+            if entry.name.endswith(".json"):
                 continue
-            # re-initialize the list
-            file_list = []
-            # iterate through directory's content
-            for filename in os.listdir(os.path.join(path_sub, exp)):
-                if filename.endswith(ext):
-                    file_list += [filename]
-
-            # save the file_list as dict item
-            ses_runs[exp] = file_list
+            # save the list of files in the directory as dict item
+            ses_runs[entry.name] = _list_files(entry.path, ext)
 
         # display the lists (optional)
         if show:
@@ -117,9 +131,7 @@ def list_sub(root, sub, ses=None, ext=".acq", save=None, show=False):
     # list files in a sub directory without sessions
     else:
         # push filenames in a list
-        for filename in os.listdir(path_sub):
-            if filename.endswith(ext):
-                file_list += [filename]
+        file_list = [entry.name for entry in ses_entries if entry.name.endswith(ext)]
         # store list
         ses_runs["files"] = file_list
 
@@ -50,13 +50,15 @@ def preprocessing_workflow(data, metadata, workflow_strategy):
                 " ",
                 None,
             ]:
-                # Get the timeseries
+                # Get the timeseries as a contiguous array, neurokit and scipy work on
+                # arrays and would otherwise convert the Series at each step
                 if signal_type in data.columns:
-                    raw = data[signal_type]
+                    column = signal_type
                 elif workflow_strategy[signal_type]["id"] in data.columns:
-                    raw = data[workflow_strategy[signal_type]["id"]]
+                    column = workflow_strategy[signal_type]["id"]
                 else:
                     raise ValueError(f"Signal type {signal_type} not found in the data.")
+                raw = data[column].to_numpy(dtype=np.float64)
                 # Apply the preprocessing strategy
                 raw, clean, components, sampling_rate = preprocess_signal(
                     raw,
@@ -186,13 +188,18 @@ def preprocess_signal(signal, preprocessing_strategy, sampling_rate=1000):
                     signal, sampling_rate=sampling_rate, **step["parameters"]
                 )
         elif step["step"] == "signal_resample":
-            # Resample the signal
-            signal = nk.signal_resample(
+            # Resample the signal; if no step was applied before, the raw and the
+            # cleaned signals are the same and only need to be resampled once
+            resampled = nk.signal_resample(
                 signal, sampling_rate=sampling_rate, **step["parameters"]
             )
-            raw = nk.signal_resample(
-                raw, sampling_rate=sampling_rate, **step["parameters"]
-            )
+            if signal is not raw:
+                raw = nk.signal_resample(
+                    raw, sampling_rate=sampling_rate, **step["parameters"]
+                )
+            else:
+                raw = resampled
+            signal = resampled
             sampling_rate = step["parameters"]["desired_sampling_rate"]
         elif step["step"] == "phasic":
             # This step is only to extract phasic and tonic components from EDA signal
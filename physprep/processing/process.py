@@ -6,6 +6,7 @@ Neuromod processing utilities.
 
 import timeit
 import traceback
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 import numpy as np
@@ -19,13 +20,12 @@ from neurokit2 import (
     signal_rate,
 )
 from neurokit2.misc import as_vector
-from neurokit2.signal.signal_formatpeaks import _signal_from_indices
 
 from physprep.utils import load_json, rename_in_bids, save_processing
 
 
 def features_extraction_workflow(
-    data, metadata, workflow_strategy
+    data, metadata, workflow_strategy, n_jobs=1
 ):
     """
     Extract features from physiological data.
@@ -39,24 +39,35 @@ def features_extraction_workflow(
         cleaned. Otherwise, the metadata associated with the raw physiological data
         (i.e., the outputed json file from Phys2Bids).
     workflow_strategy : dict
-        Dictionary containing the content of the workflow strategy.
+        Dictionary containing the content of the workflow strategy. The entry of a
+        signal type can define a `peak_detection_method`, passed as `method` to the
+        features extraction function of that signal type (e.g. `neurokit` instead of
+        the slower default `promac` for ECG signals).
+    n_jobs : int
+        Number of processes used to extract the features of the different signal
+        types in parallel. If 1, the signals are processed sequentially.
+        Default to 1.
 
     Returns
     -------
     features
     """
+    if n_jobs < 1:
+        raise ValueError(f"n_jobs must be at least 1, got {n_jobs}.")
+
     features = {}
+    extractions = {}
 
     print("Extracting features from physiological data...\n")
     # Load metadata
     if isinstance(metadata, str) or isinstance(metadata, Path):
         metadata = load_json(metadata)
 
-    # if data is a dataframe, convert to dict
-    if isinstance(data, pd.DataFrame):
-        data = data.to_dict("list")
-    
-    # Extract features for each signal type in the `workflow_strategy`
+    # DataFrame columns and dict keys are accessed the same way, so `data` is
+    # not converted
+    data_keys = "\t".join(data.keys())
+
+    # Define the extraction to run for each signal type in the `workflow_strategy`
     for idx, signal_type in enumerate(workflow_strategy):
         if signal_type not in ["trigger", "concurrentWith"]:
             # Retrieve SamplingFrequency
@@ -66,45 +77,90 @@ def features_extraction_workflow(
                 sampling_rate = metadata["SamplingFrequency"]
 
             # Extract features for each signal type
-            if signal_type not in '\t'.join(data.keys()):
+            if signal_type not in data_keys:
                 raise ValueError(f"Signal type {signal_type} not found in the data.")
 
            
             signal_key = f"{signal_type}_clean"  if f"{signal_type}_clean" in data.keys() else signal_type
 
             signal = as_vector(data[signal_key])
-            print(f"Extracting features for {signal_type}...\n")
-            start_time = timeit.default_timer()
-
-            if signal_type.lower() in ["ecg", "cardiac_ecg", "ppg", "cardiac_ppg"]:
-                info = extract_cardiac_peaks(
-                    signal,
-                    sampling_rate=sampling_rate,
-                    data_type=signal_type,
-                )
-            elif signal_type.lower() in ["respiratory", "rsp", "resp", "breathing"]:
-                info = extract_respiratory_peaks(signal, sampling_rate=sampling_rate)
-            elif signal_type.lower() in ["electrodermal", "eda", "gsr"]:
-                info = extract_electrodermal_peaks(
-                    signal, sampling_rate=sampling_rate
-                )
-
-            features.update({signal_type: info})
 
-            end_time = np.round(timeit.default_timer() - start_time, 2)
-            print(f"{signal_type} features extraction: done in {end_time} sec***\n")
+            # The peak detection method can be set in the workflow strategy, otherwise
+            # the default method of the extraction function is used
+            kwargs = {"sampling_rate": sampling_rate}
+            if "peak_detection_method" in workflow_strategy[signal_type]:
+                kwargs["method"] = workflow_strategy[signal_type]["peak_detection_method"]
+
+            signal_name = signal_type.lower()
+            if signal_name in ["ecg", "cardiac_ecg", "ppg", "cardiac_ppg"]:
+                kwargs["data_type"] = signal_type
+                extractions[signal_type] = (extract_cardiac_peaks, signal, kwargs)
+            elif signal_name in ["respiratory", "rsp", "resp", "breathing"]:
+                extractions[signal_type] = (extract_respiratory_peaks, signal, kwargs)
+            elif signal_name in ["electrodermal", "eda", "gsr"]:
+                extractions[signal_type] = (extract_electrodermal_peaks, signal, kwargs)
+
+    # The signal types are independent, so their features can be extracted in
+    # separate processes
+    if n_jobs == 1 or len(extractions) < 2:
+        for signal_type, (extraction, signal, kwargs) in extractions.items():
+            features[signal_type] = _extract_features(
+                signal_type, extraction, signal, kwargs
+            )
+    else:
+        with ProcessPoolExecutor(max_workers=min(n_jobs, len(extractions))) as executor:
+            futures = {
+                signal_type: executor.submit(
+                    _extract_features, signal_type, extraction, signal, kwargs
+                )
+                for signal_type, (extraction, signal, kwargs) in extractions.items()
+            }
+            features = {
+                signal_type: future.result() for signal_type, future in futures.items()
+            }
 
     events = convert_2_events(features, metadata)
 
     return features, events
 
+
+def _extract_features(signal_type, extraction, signal, kwargs):
+    """
+    Run the features extraction of one signal type and report its duration.
+
+    Parameters
+    ----------
+    signal_type : str
+        Name of the signal type, as defined in the workflow strategy.
+    extraction : callable
+        Features extraction function to apply on `signal`.
+    signal : array
+        The timeseries on which to extract features.
+    kwargs : dict
+        Keyword arguments passed to `extraction`.
+
+    Returns
+    -------
+    info : dict
+        The features returned by `extraction`.
+    """
+    print(f"Extracting features for {signal_type}...\n")
+    start_time = timeit.default_timer()
+
+    info = extraction(signal, **kwargs)
+
+    end_time = np.round(timeit.default_timer() - start_time, 2)
+    print(f"{signal_type} features extraction: done in {end_time} sec***\n")
+
+    return info
+
     
 # ==================================================================================
 # Features extraction functions
 # ==================================================================================
 
 
-def extract_cardiac_peaks(signal, sampling_rate=1000, data_type="ppg"):
+def extract_cardiac_peaks(signal, sampling_rate=1000, data_type="ppg", method="promac"):
     """
     Process cardiac signal.
 
@@ -120,6 +176,11 @@ def extract_cardiac_peaks(signal, sampling_rate=1000, data_type="ppg"):
     data_type : str
         Precise the type of signal to be processed (`ppg` or `ecg`).
         Default to 'ppg'.
+    method : str
+        Method used to detect the R peaks of ECG signals (see
+        :py:func:`neurokit2.ecg_peaks`). `promac` combines several detectors and is
+        the most robust but also the slowest; a single detector such as `neurokit`
+        is much faster. Ignored for PPG signals. Default to 'promac'.
 
     Returns
     -------
@@ -139,7 +200,7 @@ def extract_cardiac_peaks(signal, sampling_rate=1000, data_type="ppg"):
             _, info = ecg_peaks(
                 ecg_cleaned=signal,
                 sampling_rate=sampling_rate,
-                method="promac",
+                method=method,
                 correct_artifacts=False,
             )
             # Correct peaks
@@ -154,9 +215,6 @@ def extract_cardiac_peaks(signal, sampling_rate=1000, data_type="ppg"):
                 'r_peak': info['ECG_R_Peaks'],
                 'r_peak_corrected': info['CleanPeaksNK']
             }
-            print("Formatting peaks into signal")
-            peak_list = _signal_from_indices(info['r_peak'], desired_length=len(signal))
-            peak_list_corrected = _signal_from_indices(info['r_peak_corrected'], desired_length=len(signal))
         elif data_type.lower() in ["ppg", "cardiac_ppg"]:
             info = ppg_findpeaks(signal, sampling_rate=sampling_rate, method="elgendi")
             # Rename Peaks key
@@ -173,9 +231,6 @@ def extract_cardiac_peaks(signal, sampling_rate=1000, data_type="ppg"):
                 'systolic_peak': info['PPG_Peaks'],
                 'systolic_peak_corrected': info['CleanPeaksNK']
             }
-            print("Formatting peaks into signal")
-            peak_list = _signal_from_indices(info['systolic_peak'], desired_length=len(signal))
-            peak_list_corrected = _signal_from_indices(info['systolic_peak_corrected'], desired_length=len(signal))
         else:
             raise ValueError("Please use a valid data type: 'ecg' or 'ppg'")
 
@@ -225,10 +280,6 @@ def extract_electrodermal_peaks(signal, sampling_rate=1000, method="neurokit"):
         traceback.print_exc()
         info = {"Processed": False}
 
-    for k in info.keys():
-        if isinstance(info[k], np.ndarray):
-            info[k] = info[k].tolist()
-
     return info
 
 
@@ -274,11 +325,6 @@ def extract_respiratory_peaks(signal, sampling_rate=1000, method="khodadad2018")
         traceback.print_exc()
         info = {"Processed": False}
 
-    for k in info.keys():
-        if isinstance(info[k], np.ndarray):
-            info[k] = info[k].tolist()
-
-
     return info
 
 
@@ -286,31 +332,37 @@ def convert_2_events(features, metadata):
     # Load json dictionnary containing non continuous data
     modalities = list(features.keys())
     duration = 0
-    row=0
-    df_events = pd.DataFrame(columns=['onset', 'duration', 'trial_type', 'channel'])
+    onsets, trial_types, channels = [], [], []
     for modality in modalities:
         if isinstance(metadata["SamplingFrequency"], list):
             sampling_rate = metadata["SamplingFrequency"][idx]
         else:
             sampling_rate = metadata["SamplingFrequency"]
 
-        entities = list(features[modality].keys())
-        for entity in entities:
-            list_value = features[modality][entity]
-            if type(list_value) is int:
-                list_value = [list_value]
-            elif type(list_value) is np.ndarray:
-                list_value = list_value.tolist()
-            list_value = [value for value in list_value if str(value) != 'nan']
-                
-            for idx in list_value:
-                df_events.loc[row] = pd.Series({
-                    'onset':idx/sampling_rate, 
-                    'duration':duration, 
-                    'trial_type': entity, 
-                    'channel': modality
-                    })
-                row += 1
-                        
-
-    return df_events.sort_values(('onset'), ignore_index=True)
\ No newline at end of file
+        for entity, values in features[modality].items():
+            # Skip the modalities for which the features extraction failed
+            if isinstance(values, bool):
+                continue
+            if type(values) is int:
+                values = [values]
+            # Work on the peak indices as an array, rather than one by one
+            values = np.asarray(values, dtype=float)
+            values = values[~np.isnan(values)]
+
+            onsets.append(values / sampling_rate)
+            trial_types.extend([entity] * len(values))
+            channels.extend([modality] * len(values))
+
+    # Build the DataFrame once; enlarging it row by row copies it at each insertion
+    df_events = pd.DataFrame(
+        {
+            'onset': np.concatenate(onsets) if onsets else [],
+            'duration': duration,
+            'trial_type': trial_types,
+            'channel': channels,
+        },
+        columns=['onset', 'duration', 'trial_type', 'channel'],
+    )
+
+    # Stable sort, so the events sharing an onset stay in the order of `features`
+    return df_events.sort_values("onset", kind="stable", ignore_index=True)
@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+# !/usr/bin/env python
+"""
+Physprep run-level workflow.
+
+Load a physio run from a BIDS dataset and apply the preprocessing, features extraction
+and quality assessment steps on it. These functions live in an importable module so
+they can be sent to the worker processes of `physprep.workflow`.
+"""
+
+import numpy as np
+import pandas as pd
+
+from physprep import utils
+from physprep.processing import clean, process
+from physprep.quality import qa, report
+
+
+def load_run(file):
+    """
+    Load the timeseries, metadata and entities of a physio file.
+
+    BIDSFile objects are bound to their layout and cannot be sent to another process,
+    so the file content is loaded beforehand.
+
+    Parameters
+    ----------
+    file : bids.layout.BIDSFile
+        The physio file to load.
+
+    Returns
+    -------
+    data : DataFrame
+        The physiological timeseries, with an `onset` column.
+    metadata : dict
+        The metadata associated with the physio file.
+    entities : dict
+        The BIDS entities of the physio file.
+    """
+    # Load metada
+    metadata = file.get_metadata()
+    if not bool(metadata):
+        raise FileNotFoundError(f"No metadata file associated with {file}.")
+    # Load data. The file is read directly rather than with `file.get_df()`, which
+    # keeps the parsed table on the BIDSFile (so in memory until the end of the
+    # workflow) and returns a copy of it
+    print(f"\nLoading {file}...\n")
+    data = pd.read_csv(file.path, sep="\t", header=None, na_values="n/a")
+    # Passing the names to `read_csv` would silently use the extra columns as index
+    if data.shape[1] != len(metadata["Columns"]):
+        raise ValueError(
+            f"Length mismatch: {file.path} has {data.shape[1]} columns, but "
+            f"{len(metadata['Columns'])} are listed in its metadata."
+        )
+    data.columns = metadata["Columns"]
+    data.insert(0, "onset", np.arange(len(data)) / metadata["SamplingFrequency"])
+    print("Data loaded.\n")
+
+    return data, dict(metadata), file.get_entities()
+
+
+def process_run(
+    data, metadata, entities, workflow, derivatives_dir, save_report, n_jobs=1
+):
+    """
+    Preprocess a run, extract its features and assess its quality.
+
+    The saving functions update the BIDS entities they receive, so each one gets its
+    own copy of `entities`.
+
+    Parameters
+    ----------
+    data : DataFrame
+        The raw physiological timeseries, as returned by `load_run`.
+    metadata : dict
+        The metadata associated with the physiological timeseries.
+    entities : dict
+        The BIDS entities of the run, used to build the derivatives filenames.
+    workflow : dict
+        Dictionary containing the content of the workflow strategy.
+    derivatives_dir : pathlib.Path
+        Path to the derivatives directory.
+    save_report : bool
+        If True, a quality report is generated and saved for the run.
+    n_jobs : int
+        Number of processes used to extract the features of the different signal
+        types in parallel. Default to 1.
+    """
+    # Preprocess data
+    print("Preprocessing data...\n")
+    preprocessed_signals, metadata_derivatives = clean.preprocessing_workflow(
+        data, metadata, workflow
+    )
+    print("Saving preprocessed signals...\n")
+    utils.save_processing(
+        derivatives_dir,
+        dict(entities),
+        "preproc",
+        preprocessed_signals,
+        metadata_derivatives,
+    )
+    print("Preprocessing done.\n")
+
+    # Extract features
+    print("Extracting features...\n")
+    features, events = process.features_extraction_workflow(
+        preprocessed_signals, metadata_derivatives, workflow, n_jobs=n_jobs
+    )
+    print("Saving extracted features...\n")
+    utils.save_features(derivatives_dir, dict(entities), events)
+    print("Features extraction done.\n")
+
+    # Generate quality report
+    print("Assessing quality of the data...\n")
+    qa_metrics, qa_short = qa.computing_sqi(
+        workflow, preprocessed_signals, features, metadata_derivatives
+    )
+    print("Saving quality assessment...\n")
+    utils.save_qa(derivatives_dir, dict(entities), qa_metrics)
+    utils.save_qa(derivatives_dir, dict(entities), qa_short, short=True)
+    print("Data quality assessed.\n")
+
+    if save_report:
+        print("Generating QC report... \n")
+        qa_report = report.generate_report(
+            workflow,
+            qa_metrics,
+            preprocessed_signals,
+            features,
+            metadata_derivatives,
+            derivatives_dir,
+            dict(entities),
+        )
+        print("QC report generated. \n")
+        utils.save_qa(derivatives_dir, dict(entities), qa_report, report=True)
@@ -137,20 +137,20 @@ def sqi_cardiac(
     summary = {}
 
     peaks = [p for p in info.keys() if 'peak_corrected' in p][0]
-    rr = (np.diff(info[peaks]) / sampling_rate) * 1000
-    
+    peaks = np.asarray(info[peaks])
+    rr = (np.diff(peaks) / sampling_rate) * 1000
+
     # Segment info according to the specify window
     if window is not None:
         start, end = min(window), max(window)
-        sub_list = [x for x in info[peaks] if start <= x <= end]
-        if len(sub_list) > 0:
-            min_index = np.where(info[peaks] == min(sub_list))[0][0]
-            max_index = np.where(info[peaks] == max(sub_list))[0][0] + 1
-        else:
+        # Peaks are sorted, so the ones within the window are found by bisection
+        min_index = np.searchsorted(peaks, start, side="left")
+        max_index = np.searchsorted(peaks, end, side="right")
+        if min_index == max_index:
             min_index = None
     else:
         min_index = 0
-        max_index = len(info[peaks])
+        max_index = len(peaks)
 
     # Descriptive indices on overall signal
     summary["Skewness"] = np.round(kurtosis(signal_cardiac), 4)
@@ -222,19 +222,18 @@ def sqi_eda(signal_eda, signal_phasic, signal_tonic, info, sampling_rate=10000,
         DataFrame containing sqi values.
     """
     summary = {}
+    scr_peaks = np.asarray(info["scr_peak"])
     # Segment info according to the specify window
     if window is not None:
-        try:
-            start, end = min(window), max(window)
-            sub_list = [x for x in info["scr_peak"] if start <= x <= end]
-            min_index = info["scr_peak"].index(min(sub_list))
-            max_index = info["scr_peak"].index(max(sub_list))
-        except Exception:
+        start, end = min(window), max(window)
+        # Peaks are sorted, so the ones within the window are found by bisection
+        min_index = np.searchsorted(scr_peaks, start, side="left")
+        max_index = np.searchsorted(scr_peaks, end, side="right")
+        if min_index == max_index:
             print("No SCR detected...")
-            min_index = max_index = 0
     else:
         min_index = 0
-        max_index = len(info["scr_peak"])
+        max_index = len(scr_peaks)
 
     # Description indices on EDA
     for metric in MAPPING_METRICS:
@@ -254,8 +253,8 @@ def sqi_eda(signal_eda, signal_phasic, signal_tonic, info, sampling_rate=10000,
                 MAPPING_METRICS[metric](signal_phasic), 4
             )
     # Descriptive indices on SCR
-    if min_index != max_index and max_index != 0:
-        summary["Number_of_detected_peaks"] = len(info["scr_peak"][min_index:max_index])
+    if min_index < max_index:
+        summary["Number_of_detected_peaks"] = len(scr_peaks[min_index:max_index])
     
     rac, qa_bottcher = rac_sqi(signal_eda, sampling_rate)
     if qa_bottcher == 1:
@@ -417,6 +416,7 @@ def rac_sqi(signal, sampling_rate, threshold=0.2, duration=2):
         & Loddenkemper, T. (2022). Data quality evaluation in wearable monitoring.
         Scientific reports, 12(1), 21412.
     """
+    signal = np.asarray(signal)
     nb_windows = int(len(signal) // (duration * sampling_rate))
     rac_values, qa_scores = [], []
 
@@ -424,8 +424,10 @@ def rac_sqi(signal, sampling_rate, threshold=0.2, duration=2):
         window_start = int(i * (duration*sampling_rate))
         window_end = int(window_start + (duration*sampling_rate))
         window = signal[window_start:window_end]
-        highest_value, highest_idx = max(window), np.argmax(window)
-        lowest_value, lowest_idx = min(window), np.argmin(window)
+        # Get the extrema from their index; the max/min builtins would iterate over
+        # the window in Python
+        highest_idx, lowest_idx = np.argmax(window), np.argmin(window)
+        highest_value, lowest_value = window[highest_idx], window[lowest_idx]
 
         if lowest_idx<highest_idx:
             rac = abs(highest_value - lowest_value) / lowest_value
@@ -1,5 +1,9 @@
 """Test clean functions"""
 
+import os
+from types import SimpleNamespace
+
+import numpy as np
 import pytest
 
 from physprep.prepare import get_info
@@ -23,3 +27,60 @@ def test_order_channels():
         ch_names, chsel = get_info.order_channels(acq_channels, {})
     with pytest.raises(ValueError):
         ch_names, chsel = get_info.order_channels(acq_channels[1:], metadata_physio)
+
+
+def test_trigger_samples():
+    """Test trigger_samples function"""
+    raw = np.array([0, 0, 2000, 2000, 0, 2000], dtype=np.int16)
+    # 5 V TTL pulses stored as int16
+    channel = SimpleNamespace(raw_data=raw, raw_scale_factor=0.0025, raw_offset=0)
+    assert get_info.trigger_samples(channel, thr=4).tolist() == [2, 3, 5]
+    # Inverted scaling
+    channel = SimpleNamespace(raw_data=-raw, raw_scale_factor=-0.0025, raw_offset=0)
+    assert get_info.trigger_samples(channel, thr=4).tolist() == [2, 3, 5]
+    # Float channel, not scaled
+    channel = SimpleNamespace(raw_data=raw * 0.0025, raw_scale_factor=1, raw_offset=0)
+    assert get_info.trigger_samples(channel, thr=4).tolist() == [2, 3, 5]
+
+
+def test_volume_counter(tmp_path, monkeypatch):
+    """Test volume_counter function"""
+    fs, width = 1000, 10
+    # Three runs of 1 s TR triggers (10 samples at 5 V). The gap between the 5th and
+    # 6th triggers equals the TR, so it does not split the run
+    onsets = [0, 1000, 2000, 3000, 4000, 5009, 6009]
+    onsets += [7019, 8019, 9019]
+    onsets += [20000, 21000, 22000, 23000]
+    multi_runs = np.zeros(25000)
+    for onset in onsets:
+        multi_runs[onset : onset + width] = 5
+    single_run = np.zeros(10000)
+    for onset in range(1000, 6000, 1000):
+        single_run[onset : onset + width] = 5
+    triggers = {
+        "file1.acq": multi_runs,
+        "file2.acq": single_run,
+        # No trigger recorded
+        "file3.acq": np.zeros(10000),
+    }
+
+    def fake_read(path, channel_indexes=None):
+        channel = SimpleNamespace(
+            name="TTL",
+            samples_per_second=fs,
+            raw_data=triggers[os.path.basename(path)],
+            raw_scale_factor=1,
+            raw_offset=0,
+        )
+        return SimpleNamespace(channels=[channel])
+
+    monkeypatch.setattr(get_info, "list_sub", lambda *args: {"ses-001": list(triggers)})
+    monkeypatch.setattr(get_info, "read_headers", fake_read)
+    monkeypatch.setattr(get_info, "read_file", fake_read)
+
+    metadata_physio = {"trigger": {"id": "TTL", "Channel": "TTL"}}
+    ses_runs, ch_names, chsel = get_info.volume_counter(
+        str(tmp_path), "sub-01", metadata_physio, tr=1
+    )
+    assert ses_runs == {"ses-001": [[7, 3, 4], [5], "No trigger input"]}
+    assert ch_names == ["trigger"]
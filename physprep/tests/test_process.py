@@ -1,10 +1,107 @@
 """Test clean functions"""
 
+import neurokit2 as nk
+import numpy as np
+import pandas as pd
+import pytest
 from neurokit2 import data
 
+from physprep.processing import process
+
 
 def test_workflow_process():
     """Test workflow_process function"""
     test_data = data("bio_resting_5min_100hz")
     print(test_data)
     pass  # TODO
+
+
+def test_features_extraction_workflow(monkeypatch):
+    """Test features_extraction_workflow function"""
+    calls = {}
+
+    def extract(signal, **kwargs):
+        calls[kwargs.get("data_type", "RSP")] = kwargs
+        return {"peak": [1]}
+
+    monkeypatch.setattr(process, "extract_cardiac_peaks", extract)
+    monkeypatch.setattr(process, "extract_respiratory_peaks", extract)
+    data = {"ECG_clean": np.zeros(10), "RSP_clean": np.zeros(10)}
+    workflow = {"ECG": {"peak_detection_method": "neurokit"}, "RSP": {}}
+    features, _ = process.features_extraction_workflow(
+        data, {"SamplingFrequency": 100}, workflow
+    )
+    assert features == {"ECG": {"peak": [1]}, "RSP": {"peak": [1]}}
+    # The method is only passed when set in the workflow strategy
+    assert calls["ECG"] == {
+        "sampling_rate": 100,
+        "data_type": "ECG",
+        "method": "neurokit",
+    }
+    assert calls["RSP"] == {"sampling_rate": 100}
+
+    # Invalid number of jobs
+    with pytest.raises(ValueError, match="n_jobs"):
+        process.features_extraction_workflow(
+            data, {"SamplingFrequency": 100}, workflow, n_jobs=0
+        )
+
+
+def test_features_extraction_workflow_n_jobs():
+    """Test features_extraction_workflow function with the signals in parallel"""
+    data = {
+        "ECG_clean": nk.ecg_simulate(duration=30, sampling_rate=100, random_state=1),
+        "RSP_clean": nk.rsp_simulate(duration=30, sampling_rate=100, random_state=1),
+    }
+    workflow = {"ECG": {"peak_detection_method": "neurokit"}, "RSP": {}}
+    features, events = process.features_extraction_workflow(
+        data, {"SamplingFrequency": 100}, workflow
+    )
+    features_parallel, events_parallel = process.features_extraction_workflow(
+        data, {"SamplingFrequency": 100}, workflow, n_jobs=2
+    )
+    np.testing.assert_equal(features_parallel, features)
+    pd.testing.assert_frame_equal(events_parallel, events)
+
+
+def test_convert_2_events():
+    """Test convert_2_events function"""
+    features = {
+        "PPG": {
+            "systolic_peak": np.array([100, 200]),
+            "systolic_peak_corrected": np.array([100, 250]),
+        },
+        "ECG": {"r_peak": [200], "r_peak_corrected": np.array([100.0, np.nan])},
+        "EDA": {"Processed": False},
+        "RSP": {"inhale_max": 50},
+    }
+    events = process.convert_2_events(features, {"SamplingFrequency": 100})
+    assert list(events.columns) == ["onset", "duration", "trial_type", "channel"]
+    # Events sharing an onset keep the order of `features`
+    assert events["onset"].tolist() == [0.5, 1.0, 1.0, 1.0, 2.0, 2.0, 2.5]
+    assert events["trial_type"].tolist() == [
+        "inhale_max",
+        "systolic_peak",
+        "systolic_peak_corrected",
+        "r_peak_corrected",
+        "systolic_peak",
+        "r_peak",
+        "systolic_peak_corrected",
+    ]
+    assert events["channel"].tolist() == ["RSP", "PPG", "PPG", "ECG", "PPG", "ECG", "PPG"]
+    assert (events["duration"] == 0).all()
+
+    # Large enough for the sort algorithm to matter
+    peaks = np.arange(0, 10000, 100)
+    features = {
+        "PPG": {"systolic_peak": peaks, "systolic_peak_corrected": peaks},
+        "ECG": {"r_peak": peaks, "r_peak_corrected": peaks},
+    }
+    events = process.convert_2_events(features, {"SamplingFrequency": 100})
+    assert events["onset"].tolist() == np.repeat(peaks / 100, 4).tolist()
+    assert events["trial_type"].tolist() == [
+        "systolic_peak",
+        "systolic_peak_corrected",
+        "r_peak",
+        "r_peak_corrected",
+    ] * len(peaks)
@@ -38,6 +38,39 @@ def test_sqi_cardiac_overview():
     assert time_sqi.sqi_cardiac_overview(simulated_data) == {}
 
 
+def test_sqi_cardiac():
+    signal = np.sin(np.linspace(0, 20 * np.pi, 2000))
+    info = {"systolic_peak_corrected": np.arange(50, 2000, 100)}
+    summary = time_sqi.sqi_cardiac(signal, info, sampling_rate=100, window=[0, 1000])
+    assert summary["Mean_NN_intervals (ms)"] == 1000.0
+    assert summary["Quality"] == "Acceptable"
+    # No peaks within the window
+    summary = time_sqi.sqi_cardiac(signal, info, sampling_rate=100, window=[0, 10])
+    assert summary["Mean_NN_intervals (ms)"] is None
+    assert summary["Quality"] == "Not acceptable"
+
+
+def test_sqi_eda():
+    signal = np.abs(np.sin(np.linspace(0, 20 * np.pi, 2000))) + 0.1
+    info = {"scr_peak": np.arange(50, 2000, 100)}
+    summary = time_sqi.sqi_eda(signal, None, None, info, sampling_rate=100)
+    assert summary["Number_of_detected_peaks"] == 20
+    summary = time_sqi.sqi_eda(
+        signal, None, None, info, sampling_rate=100, window=[0, 1000]
+    )
+    assert summary["Number_of_detected_peaks"] == 10
+    # A single peak within the window
+    summary = time_sqi.sqi_eda(
+        signal, None, None, info, sampling_rate=100, window=[0, 100]
+    )
+    assert summary["Number_of_detected_peaks"] == 1
+    # No peaks within the window
+    summary = time_sqi.sqi_eda(
+        signal, None, None, info, sampling_rate=100, window=[0, 10]
+    )
+    assert "Number_of_detected_peaks" not in summary
+
+
 def test_sqi_eda_overview():
     simulated_data = {"a": np.array([]), "b": np.arange(0, 10)}
     assert time_sqi.sqi_eda_overview(len(simulated_data["a"]), 0) == {
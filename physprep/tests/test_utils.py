@@ -2,6 +2,7 @@
 
 import json
 import os
+import pickle
 
 import pandas as pd
 import pytest
@@ -30,7 +31,6 @@ def test_check_filename():
     # Save data
     with open(os.path.join(outdir, filename), "w") as tmp:
         json.dump(data, tmp)
-    tmp.close()
     # Check filename when file exists, overwrite = False
     with pytest.raises(FileExistsError):
         filename = utils._check_filename(outdir, filename, extension, overwrite=False)
@@ -54,13 +54,70 @@ def test_load_json():
     # Save data
     with open(filename, "w") as tmp:
         json.dump(data, tmp)
-    tmp.close()
     # Load data
     data_loaded = utils.load_json(filename)
     # Check
     assert data_loaded == data
+    # Json starting with a BOM or whitespace, and scalar document
+    for prefix in [b"\xef\xbb\xbf", b"\n "]:
+        with open(filename, "wb") as tmp:
+            tmp.write(prefix + json.dumps(data).encode())
+        assert utils.load_json(filename) == data
+    with open(filename, "w") as tmp:
+        tmp.write("3")
+    assert utils.load_json(filename) == 3
     # Delete file
     os.remove(filename)
+    # Pickled data
+    filename = "test.pkl"
+    for protocol in [0, pickle.HIGHEST_PROTOCOL]:
+        with open(filename, "wb") as tmp:
+            pickle.dump(data, tmp, protocol=protocol)
+        assert utils.load_json(filename) == data
+    os.remove(filename)
+
+
+def test_create_config_workflow(tmp_path, monkeypatch):
+    """
+    Test the create_config_workflow function with new qa strategies.
+    """
+    answers = iter(
+        [
+            # PPG signal with a new qa strategy
+            "PPG",
+            "PPG",
+            "neuromod_ppg",
+            "new",
+            "qa_ppg",
+            "metric",
+            "Mean",
+            "HR",
+            "",
+            # RSP signal with a new qa strategy
+            "RSP",
+            "RSP",
+            "neuromod_rsp",
+            "new",
+            "qa_rsp",
+            "metric",
+            "Mean",
+            "Rate",
+            "",
+            # No more signals
+            "",
+        ]
+    )
+    monkeypatch.setattr("builtins.input", lambda prompt="": next(answers))
+    utils.create_config_workflow(str(tmp_path), "workflow.json")
+
+    with open(tmp_path / "workflow.json") as f:
+        workflow = json.load(f)
+    assert workflow["PPG"]["qa_strategy"] == os.path.join(tmp_path, "qa_ppg.json")
+    assert workflow["RSP"]["qa_strategy"] == os.path.join(tmp_path, "qa_rsp.json")
+    with open(tmp_path / "qa_ppg.json") as f:
+        assert json.load(f) == [{"metric": "Mean", "feature": "HR"}]
+    with open(tmp_path / "qa_rsp.json") as f:
+        assert json.load(f) == [{"metric": "Mean", "feature": "Rate"}]
 
 
 def test_check_input_validity():  # option, valid_options, empty=True):
@@ -78,6 +135,8 @@ def test_check_input_validity():  # option, valid_options, empty=True):
     assert utils._check_input_validity("2", "odd") is False  # invalid
     # Test float
     assert utils._check_input_validity("1.0", float) == 1.0  # valid
+    assert utils._check_input_validity("1,5", float) == 1.5  # valid
+    assert utils._check_input_validity("1,5", [int, float]) == 1.5  # valid
     assert utils._check_input_validity("a", float) is False  # invalid
 
 
@@ -0,0 +1,111 @@
+"""Test workflow"""
+
+import json
+import subprocess
+import sys
+
+import neurokit2 as nk
+import numpy as np
+import pandas as pd
+import pytest
+from bids import BIDSLayout
+from click.testing import CliRunner
+
+from physprep import workflow
+from physprep.processing.run import load_run
+
+
+def _create_dataset(path, nb_run=2, duration=60, sampling_rate=1000):
+    """Save simulated physio runs, with a trigger channel, as a BIDS dataset."""
+    func = path / "sub-01" / "ses-001" / "func"
+    func.mkdir(parents=True)
+    with open(path / "dataset_description.json", "w") as f:
+        json.dump({"Name": "test", "BIDSVersion": "1.8.0"}, f)
+
+    n_samples = duration * sampling_rate
+    for run in range(1, nb_run + 1):
+        kwargs = {
+            "duration": duration,
+            "sampling_rate": sampling_rate,
+            "random_state": run,
+        }
+        data = pd.DataFrame(
+            {
+                "time": np.arange(n_samples) / sampling_rate,
+                "PPG": nk.ppg_simulate(**kwargs),
+                "ECG": nk.ecg_simulate(**kwargs),
+                "EDA": nk.eda_simulate(scr_number=3, **kwargs)[:n_samples],
+                "RSP": nk.rsp_simulate(**kwargs),
+                "TTL": np.full(n_samples, 5.0),
+            }
+        )
+        filename = func / f"sub-01_ses-001_task-test_run-{run}_physio"
+        data.to_csv(f"{filename}.tsv.gz", sep="\t", header=False, index=False)
+        with open(f"{filename}.json", "w") as f:
+            json.dump(
+                {
+                    "SamplingFrequency": sampling_rate,
+                    "StartTime": 0,
+                    "Columns": list(data.columns),
+                },
+                f,
+            )
+
+
+def test_workflow_n_jobs(tmp_path):
+    """Test the workflow with the runs processed in parallel"""
+    _create_dataset(tmp_path / "bids")
+    derivatives_dir = tmp_path / "derivatives"
+    # Run as `python -m`, like from a shell, so the workers get their functions from
+    # an importable module and not from `__main__`
+    subprocess.run(
+        [
+            sys.executable,
+            "-m",
+            "physprep.workflow",
+            "neuromod",
+            str(tmp_path / "bids"),
+            "--derivatives_dir",
+            str(derivatives_dir),
+            "--n_jobs",
+            "2",
+        ],
+        check=True,
+    )
+    outdir = derivatives_dir / "sub-01" / "ses-001" / "func"
+    for run in [1, 2]:
+        prefix = f"sub-01_ses-001_task-test_run-{run}"
+        for suffix in [
+            "desc-preproc_physio.tsv.gz",
+            "desc-physio_events.tsv",
+            "desc-quality.json",
+            "desc-qualitydesc.json",
+        ]:
+            assert (outdir / f"{prefix}_{suffix}").is_file()
+
+    # Invalid number of jobs
+    result = CliRunner().invoke(
+        workflow.main, ["neuromod", str(tmp_path / "bids"), "--n_jobs", "0"]
+    )
+    assert result.exit_code == 2
+
+
+def test_load_run(tmp_path):
+    """Test load_run function"""
+    _create_dataset(tmp_path, nb_run=1, duration=10)
+    layout = BIDSLayout(tmp_path, validate=False)
+    file = layout.get(suffix="physio", extension="tsv.gz")[0]
+    data, metadata, entities = load_run(file)
+    assert list(data.columns) == ["onset"] + metadata["Columns"]
+    assert len(data) == 10000
+    assert entities["run"] == 1
+
+    # The metadata do not list all the columns of the file
+    filename = file.path.replace(".tsv.gz", ".json")
+    metadata["Columns"] = metadata["Columns"][1:]
+    with open(filename, "w") as f:
+        json.dump(metadata, f)
+    layout = BIDSLayout(tmp_path, validate=False)
+    file = layout.get(suffix="physio", extension="tsv.gz")[0]
+    with pytest.raises(ValueError, match="Length mismatch"):
+        load_run(file)
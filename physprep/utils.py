@@ -1,8 +1,13 @@
-"""Utilities for Physprep"""
+"""Utilities for Physprep
 
+The helpers in this module only handle strings, files and user prompts; they are
+not worth compiling with Numba, the numerical work is done in
+`physprep.processing` and `physprep.quality`.
+"""
+
+import functools
 import json
 import os
-import pickle
 import pkgutil
 import re
 import warnings
@@ -14,6 +19,11 @@ from bids.exceptions import BIDSValidationError
 from bids.layout import BIDSFile
 from pkg_resources import resource_filename
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 WORKFLOW_STRATEGIES = ["neuromod"]
 PREPROCESSING_STRATEGIES = [
     "neuromod_ecg",
@@ -22,17 +32,80 @@ PREPROCESSING_STRATEGIES = [
     "neuromod_rsp",
 ]
 QA_STRATEGIES = ["neuromod_cardiac", "neuromod_eda", "neuromod_rsp"]
+# gzip level used for the .tsv.gz derivatives; pandas defaults to the slowest level
+# (9), which barely reduces the size of the physiological timeseries
+TSV_GZ_COMPRESSION = {"method": "gzip", "compresslevel": 6}
+# First byte of the pickles written with protocol 2 or higher (PROTO opcode)
+_PICKLE_PROTO = b"\x80"
+# Options of the interactive config generators
+QA_STEPS = ["sliding", "metric", "feature"]
+PREPROCESSING_STEPS = ["filtering", "resampling"]
+FILTERS = ["butterworth", "fir", "bessel", "savgol", "notch"]
+NOTCH_METHODS = ["biopac", "bottenhorn"]
+_FILTERS_PROMPT = f"\n Enter the filter type among the following: {', '.join(FILTERS)}.\n"
+_FILTERING_STEPS = frozenset({"filtering", "filter"})
+# Metadata of the signal types supported by the workflow config generator
+_PPG_META = {"id": "PPG", "Description": "continuous pulse measurement", "Units": "V"}
+_ECG_META = {
+    "id": "ECG",
+    "Description": "continuous electrocardiogram measurement",
+    "Units": "mV",
+}
+_EDA_META = {
+    "id": "EDA",
+    "Description": "continuous electrodermal measurement",
+    "Units": "microsiemens",
+}
+_RSP_META = {
+    "id": "RESP",
+    "Description": "continuous breathing measurement",
+    "Units": "cm H2O",
+}
+_SIGNAL_META = {
+    "PPG": _PPG_META,
+    "cardiac_ppg": _PPG_META,
+    "ECG": _ECG_META,
+    "cardiac_ecg": _ECG_META,
+    "EDA": _EDA_META,
+    "GSR": _EDA_META,
+    "electrodermal": _EDA_META,
+    "RSP": _RSP_META,
+    "RESP": _RSP_META,
+    "respiratory": _RSP_META,
+    "trigger": {
+        "id": "TTL",
+        "Description": "continuous measurement of the scanner trigger signal",
+        "Units": "V",
+    },
+}
+# Patterns used to rename the columns/keys in BIDS format
+_CAPITALIZED_WORD_RE = re.compile("(.)([A-Z][a-z]+)")
+_LOWER_UPPER_RE = re.compile("([a-z0-9])([A-Z])")
+_CAMEL_CASE_RE = re.compile(r"^[a-zA-Z][a-zA-Z0-9]*$")
+
+
+def _json_loads(content):
+    # Use orjson when available, it parses much faster than the json module
+    if orjson is not None:
+        try:
+            return orjson.loads(content)
+        except orjson.JSONDecodeError:
+            # orjson is stricter than json (e.g. it rejects NaN), so let json try
+            pass
+    return json.loads(content)
+
+
+def _resolve_path(outdir, filename):
+    return os.path.join(outdir, filename).strip()
 
 
 def _check_filename(outdir, filename, extension=None, overwrite=False):
-    # Check extension if specified
-    if extension is not None:
-        root, ext = os.path.splitext(filename)
-        if not ext or ext != extension:
-            filename = root + extension
+    # Check extension if specified, most filenames already have it
+    if extension is not None and not filename.endswith(extension):
+        filename = os.path.splitext(filename)[0] + extension
 
     # Check if file already exist
-    if os.path.exists(os.path.join(outdir, filename).strip()):
+    if os.path.exists(_resolve_path(outdir, filename)):
         if not overwrite:
             raise FileExistsError(
                 "Killing the script because the file already exist. "
@@ -49,73 +122,120 @@ def _check_filename(outdir, filename, extension=None, overwrite=False):
     return filename
 
 
+_COMMA_TO_DOT = str.maketrans({",": "."})
+
+
+def _validate_number(option):
+    # Accept both decimal separators
+    option = option.translate(_COMMA_TO_DOT)
+    if "." in option:
+        return float(option)
+    elif option.isdigit() is False:
+        print("**Please enter a positive number.")
+        return False
+    else:
+        return int(option)
+
+
+def _validate_int(option):
+    if option.isdigit() is False:
+        print("**Please enter a positive integer.")
+        return False
+    return int(option)
+
+
+def _validate_odd(option):
+    option = _validate_int(option)
+    if option is not False and option % 2 == 0:
+        print("**Please enter an odd number.")
+        return False
+    return option
+
+
+def _validate_float(option):
+    option = option.translate(_COMMA_TO_DOT)
+    if "." in option:
+        return float(option)
+    else:
+        print("**Please enter a positive float.")
+        return False
+
+
+_EMPTY_OPTIONS = frozenset({"", " "})
+_OPTION_ALIASES = {"resampling": "signal_resample"}
+_VALIDATORS = {int: _validate_int, "odd": _validate_odd, float: _validate_float}
+
+
+@functools.lru_cache(maxsize=64)
+def _join_options(options):
+    # The option lists are constants, they only need to be formatted once
+    return ", ".join(options)
+
+
 def _check_input_validity(option, valid_options, empty=True):
-    if type(valid_options) is list:
-        if empty:
-            if option in ["", " "]:
-                return option
+    if isinstance(valid_options, list):
+        if empty and option in _EMPTY_OPTIONS:
+            return option
         if int in valid_options or float in valid_options:
-            if "." in option or "," in option:
-                return float(option)
-            elif option.isdigit() is False:
-                print("**Please enter a positive number.")
-                return False
-            else:
-                return int(option)
-        else:
-            if option not in valid_options:
-                print(f"**Please enter a valid option: {', '.join(valid_options)}.")
-                return False
-            else:
-                if option == "resampling":
-                    option = "signal_resample"
-                return option
-    if valid_options in [int, "odd"]:
-        if option.isdigit() is False:
-            print("**Please enter a positive integer.")
-            return False
-        if valid_options == "odd":
-            if int(option) % 2 == 0:
-                print("**Please enter an odd number.")
-                return False
-            else:
-                return int(option)
-        else:
-            return int(option)
-    if valid_options == float:
-        if "." in option or "," in option:
-            return float(option)
-        else:
-            print("**Please enter a positive float.")
+            return _validate_number(option)
+        if option not in valid_options:
+            options = _join_options(tuple(valid_options))
+            print(f"**Please enter a valid option: {options}.")
             return False
+        return _OPTION_ALIASES.get(option, option)
+
+    validator = _VALIDATORS.get(valid_options)
+    if validator is not None:
+        return validator(option)
+
+
+_YN = ["y", "n"]
+_REF_FIELDS = [
+    ("authors", "Enter the author(s) name: \n"),
+    ("year", "Enter the publication year: \n"),
+    ("title", "Enter the publication title: \n"),
+]
+_JOURNAL_FIELDS = [
+    ("journal", "Enter the title of the journal: \n"),
+    ("volume", "Enter the volume number: \n"),
+    ("issue", "Enter the issue number: \n"),
+    ("page", "Enter the page numbers: \n"),
+    ("doi", "Enter the DOI: \n"),
+]
+_BOOK_FIELDS = [
+    ("publisher", "Enter the name of the publisher: \n"),
+    ("location", "Enter the location of the publisher (city and state/country): \n"),
+]
+
+
+def _ask_fields(ref, fields):
+    for key, prompt in fields:
+        ref[key] = input(prompt)
+
+
+def _ask(prompt, valid_options, empty=True, lower=False):
+    # Prompt the user until a valid answer is given
+    answer = False
+    while answer is False:
+        answer = input(prompt)
+        if lower:
+            answer = answer.lower()
+        answer = _check_input_validity(answer, valid_options, empty=empty)
+    return answer
+
+
+def _ask_yes_no(prompt, empty=True):
+    return _ask(prompt, _YN, empty=empty)
 
 
 def _create_ref():
-    # Instantiate variable
-    ref = {}
-    publication_type = book = False
     # Collect input
-    ref["authors"] = input("Enter the author(s) name: \n")
-    ref["year"] = input("Enter the publication year: \n")
-    ref["title"] = input("Enter the publication title: \n")
-    while publication_type is False:
-        publication_type = input("Is the source of information a journal ? [y/n] \n")
-        publication_type = _check_input_validity(publication_type, ["y", "n"])
-    if publication_type == "y":
-        ref["journal"] = input("Enter the title of the journal: \n")
-        ref["volume"] = input("Enter the volume number: \n")
-        ref["issue"] = input("Enter the issue number: \n")
-        ref["page"] = input("Enter the page numbers: \n")
-        ref["doi"] = input("Enter the DOI: \n")
-    else:
-        while book is False:
-            book = input("Is the source of information a book ? [y/n] \n")
-            book = _check_input_validity(book, ["y", "n"])
-        if book == "y":
-            ref["publisher"] = input("Enter the name of the publisher: \n")
-            ref["location"] = input(
-                "Enter the location of the publisher (city and state/country): \n"
-            )
+    ref = {}
+    _ask_fields(ref, _REF_FIELDS)
+    if _ask_yes_no("Is the source of information a journal ? [y/n] \n") == "y":
+        _ask_fields(ref, _JOURNAL_FIELDS)
+    elif _ask_yes_no("Is the source of information a book ? [y/n] \n") == "y":
+        _ask_fields(ref, _BOOK_FIELDS)
 
     ref["url"] = input("Enter the URL of the source: \n")
 
@@ -180,7 +300,6 @@ def _check_bids_validity(path, is_derivative=False):
                 )
             with open(f"{path}/dataset_description.json", "w") as f:
                 json.dump(json.loads(descrip.decode()), f, indent=4)
-            f.close()
             layout = BIDSLayout(path, validate=False, is_derivative=is_derivative)
 
         return layout
@@ -198,19 +317,21 @@ def load_json(filename):
     data : dict
         Dictionary with the content of the .json passed in argument.
     """
-    try:
-        with open(filename, "r") as tmp:
-            data = json.loads(tmp.read())
-        tmp.close()
-    except Exception:
+    # Read the file once and unpickle it directly when it starts with the PROTO
+    # opcode, instead of trying json and re-opening the file for pickle
+    with open(filename, "rb") as tmp:
+        content = tmp.read()
+
+    if content[:1] != _PICKLE_PROTO:
         try:
-            with open(filename, "rb") as tmp:
-                data = pickle.load(tmp)
-            tmp.close()
-        except Exception:
+            return _json_loads(content)
+        except ValueError:
+            # Pickles written with protocol 0 or 1 have no header
             pass
 
-    return data
+    import pickle
+
+    return pickle.loads(content)
 
 
 def save_processing(outdir, bids_entities, descriptor, data, metadata, save_raw=False):
@@ -272,7 +393,7 @@ def save_processing(outdir, bids_entities, descriptor, data, metadata, save_raw=
             # Make sure directory exists
             Path(BIDSFile(filename).dirname).mkdir(parents=True, exist_ok=True)
             # Save data
-            df.to_csv(filename, sep="\t", index=False, compression="gzip")
+            df.to_csv(filename, sep="\t", index=False, compression=TSV_GZ_COMPRESSION)
     else:
         df = pd.DataFrame({col: data[col] for col in to_keep})
 
@@ -280,7 +401,7 @@ def save_processing(outdir, bids_entities, descriptor, data, metadata, save_raw=
         # Make sure directory exists
         Path(BIDSFile(filename).dirname).mkdir(parents=True, exist_ok=True)
         # Save data
-        df.to_csv(filename, sep="\t", index=False, compression="gzip")
+        df.to_csv(filename, sep="\t", index=False, compression=TSV_GZ_COMPRESSION)
 
 
 def save_features(outdir, bids_entities, events):
@@ -319,11 +440,9 @@ def save_qa(outdir, bids_entities, qa_output, short=False, report=False):
     if report:
         with open(filename, "w") as f:
             f.write(qa_output)
-            f.close()
     else:
         with open(filename, "w") as f:
             json.dump(qa_output, f, indent=4)
-            f.close()
 
 
 def create_config_qa(outdir, filename, modality, overwrite=False):
@@ -341,13 +460,18 @@ def create_config_qa(outdir, filename, modality, overwrite=False):
     overwrite: bool
         If `True`, overwrite the existing file with the specified `filename` in the
         `outdir` directory. Default is False.
+
+    Returns
+    -------
+    filename: str
+        Validated saving filename.
     """
     # Instantiate variables
     tmp = []
-    valid_steps = ["sliding", "metric", "feature"]
 
     # Validate filename
     filename = _check_filename(outdir, filename, extension=".json", overwrite=overwrite)
+    filepath = _resolve_path(outdir, filename)
 
     # Validate modality:
     if modality not in ["ECG", "PPG", "RSP", "EDA"]:
@@ -397,38 +521,32 @@ def create_config_qa(outdir, filename, modality, overwrite=False):
         valid_features = ["signal", "Tonic", "Phasic", "Peaks"]
 
     while True:
-        step = input(
+        step = _ask(
             "\nEnter a qa step among the following: `sliding` to "
             "specify a window in which to compute some qa metrics. \nIf "
             "you want the metrics to be compute on the whole signal, "
             "do not enter `sliding`. \nIf you want to enter a metric, "
             "enter `metric`. \nIf you do not want to add a step, just "
-            "press enter.\n"
+            "press enter.\n",
+            QA_STEPS,
+            lower=True,
         )
-        step = _check_input_validity(step.lower(), valid_steps, empty=True)
 
-        if step not in ["", " "]:
+        if step not in _EMPTY_OPTIONS:
             if step == "sliding":
                 is_sliding = [True for elem in tmp if "sliding" in elem.keys()]
                 if not is_sliding:
-                    duration = step_window = False
-                    while duration is False:
-                        duration = input(
-                            "\nEnter the duration of the window (in seconds): \n"
-                        )
-                        duration = _check_input_validity(
-                            duration, [int, float], empty=True
-                        )
-                    while step_window is False:
-                        step_window = input(
-                            "\nEnter the step of the window (in seconds), if you want "
-                            "to compute the metrics in rolling windows: \n"
-                        )
-                        if step_window in ["", " "]:
-                            step_window = 0
-                        step_window = _check_input_validity(
-                            step_window, [int, float], empty=True
-                        )
+                    duration = _ask(
+                        "\nEnter the duration of the window (in seconds): \n",
+                        [int, float],
+                    )
+                    step_window = _ask(
+                        "\nEnter the step of the window (in seconds), if you want "
+                        "to compute the metrics in rolling windows: \n",
+                        [int, float],
+                    )
+                    if step_window in _EMPTY_OPTIONS:
+                        step_window = 0
                     tmp.append({"sliding": {"duration": duration, "step": step_window}})
                 else:
                     print("\nA window was already specified. \n")
@@ -460,10 +578,12 @@ def create_config_qa(outdir, filename, modality, overwrite=False):
             # Save the configuration file only if there is at least one signal
             if bool(tmp):
                 print("\n---Saving configuration file---")
-                with open(os.path.join(outdir, filename), "w") as f:
-                    json.dump(tmp, f, indent=4)
+                with open(filepath, "w") as f:
+                    f.write(json.dumps(tmp, indent=4))
             break
 
+    return filename
+
 
 def create_config_preprocessing(outdir, filename, overwrite=False):
     """
@@ -478,141 +598,121 @@ def create_config_preprocessing(outdir, filename, overwrite=False):
     overwrite: bool
         If `True`, overwrite the existing file with the specified `filename` in the
         `outdir` directory. Default is False.
+
+    Returns
+    -------
+    filename: str
+        Validated saving filename.
     """
     # Instantiate variables
     steps = []
-    valid_filters = ["butterworth", "fir", "bessel", "savgol", "notch"]
-    valid_noth_method = ["biopac", "bottenhorn"]
-    valid_steps = ["filtering", "resampling"]
 
     filename = _check_filename(outdir, filename, extension=".json", overwrite=overwrite)
+    filepath = _resolve_path(outdir, filename)
 
     while True:
         tmp = {}
         tmp_params = {}
-        step = input(
+        step = _ask(
             "\n Enter a processing step among the following: resampling, "
-            "filtering.\nIf you do not want to add a step, just press enter.\n"
+            "filtering.\nIf you do not want to add a step, just press enter.\n",
+            PREPROCESSING_STEPS,
+            lower=True,
         )
-        step = _check_input_validity(step.lower(), valid_steps, empty=True)
-        if step not in ["", " "]:
-            method = lowcut = highcut = order = desired_sampling_rate = cutoff = ref = (
-                notch_method
-            ) = Q = tr = slices = mb = False
-            tmp["step"] = step
-            if step in ["filtering", "filter"]:
-                while method is False:
-                    method = input(
-                        "\n Enter the filter type among the following: "
-                        f"{', '.join(valid_filters)}.\n"
-                    )
-                    tmp_params["method"] = _check_input_validity(
-                        method.lower(), valid_filters
-                    )
-                if method == "notch":
-                    while Q is False:
-                        Q = input("\n Enter the quality factor for the notch filter. \n")
-                        Q = _check_input_validity(Q, [int, float])
-                        tmp_params["Q"] = Q
-                    while notch_method is False:
-                        notch_method = input(
-                            "\n Enter the notch filter method among the following:  "
-                            "biopac, bottenhorn.\n "
-                        )
-                        notch_method = _check_input_validity(
-                            notch_method, valid_noth_method
-                        )
-                        tmp_params["notch_method"] = notch_method
-                    while tr is False:
-                        tr = input("\n Enter the tr used to acquired the fMRI data. \n")
-                        tr = _check_input_validity(tr, [int, float])
-                        tmp_params["tr"] = tr
-                    while slices is False:
-                        slices = input(
-                            "\n Enter the number of slices used to acquired the fMRI "
-                            "data.\n "
-                        )
-                        slices = _check_input_validity(slices, int)
-                        tmp_params["slices"] = slices
-                    if notch_method == "bottenhorn":
-                        while mb is False:
-                            mb = input(
-                                "\n Enter the multi-band acceleration factor used to "
-                                "acquired the fMRI data.\n "
-                            )
-                            mb = _check_input_validity(mb, int)
-                            tmp_params["mb"] = mb
-                if method in ["butterworth", "fir", "bessel"]:
-                    while cutoff is False:
-                        while lowcut is False:
-                            lowcut = input(
-                                "\n Enter the lower cutoff frequency (Hz). "
-                                "If you do not want to apply a high pass or band "
-                                "pass filter, just press enter. \n"
-                            )
-                            lowcut = _check_input_validity(
-                                lowcut, [int, float], empty=True
-                            )
-                            if lowcut not in ["", " "]:
-                                tmp_params["lowcut"] = lowcut
-                        while highcut is False:
-                            highcut = input(
-                                "\n Enter the higher cutoff frequency (Hz). "
-                                "If you do not want to apply a low pass filter "
-                                "or band pass filter, just press enter. \n"
-                            )
-                            highcut = _check_input_validity(
-                                highcut, [int, float], empty=True
-                            )
-                            if highcut not in ["", " "]:
-                                tmp_params["highcut"] = highcut
-                        if lowcut in ["", " "] and highcut in ["", " "]:
-                            print(
-                                "**Please enter either the filter lower cutoff frequency "
-                                "and/or the filter higher cutoff frequency"
-                            )
-                            lowcut = highcut = False
-                        else:
-                            cutoff = True
-                if method in ["savgol", "butterworth", "bessel"]:
-                    while order is False:
-                        order = input(
-                            "\n Enter the filter order. Must be a positive " "integer.\n"
-                        )
-                        order = _check_input_validity(order, int)
-                        tmp_params["order"] = order
-                if method == "savgol":
-                    window_size = input(
-                        "\n Enter the length of the filter window. Must be an odd "
-                        "integer.\n"
+        if step in _EMPTY_OPTIONS:
+            print("\n---Saving configuration file---")
+            with open(filepath, "w") as f:
+                f.write(json.dumps(steps, indent=4))
+            break
+
+        tmp["step"] = step
+        if step in _FILTERING_STEPS:
+            method = tmp_params["method"] = _ask(_FILTERS_PROMPT, FILTERS, lower=True)
+            if method == "notch":
+                tmp_params["Q"] = _ask(
+                    "\n Enter the quality factor for the notch filter. \n",
+                    [int, float],
+                )
+                notch_method = tmp_params["notch_method"] = _ask(
+                    "\n Enter the notch filter method among the following:  "
+                    "biopac, bottenhorn.\n ",
+                    NOTCH_METHODS,
+                )
+                tmp_params["tr"] = _ask(
+                    "\n Enter the tr used to acquired the fMRI data. \n", [int, float]
+                )
+                tmp_params["slices"] = _ask(
+                    "\n Enter the number of slices used to acquired the fMRI data.\n ",
+                    int,
+                )
+                if notch_method == "bottenhorn":
+                    tmp_params["mb"] = _ask(
+                        "\n Enter the multi-band acceleration factor used to "
+                        "acquired the fMRI data.\n ",
+                        int,
                     )
-                    window_size = _check_input_validity(window_size, "odd")
-                    tmp_params["window_size"] = window_size
-            if step == "signal_resample":
-                while desired_sampling_rate is False:
-                    desired_sampling_rate = input(
-                        "\n Enter the desired sampling frequency "
-                        "to resample the signal (in Hz). \n"
+            if method in ["butterworth", "fir", "bessel"]:
+                while True:
+                    lowcut = _ask(
+                        "\n Enter the lower cutoff frequency (Hz). "
+                        "If you do not want to apply a high pass or band "
+                        "pass filter, just press enter. \n",
+                        [int, float],
                     )
-                    desired_sampling_rate = _check_input_validity(
-                        desired_sampling_rate, [int, float]
+                    highcut = _ask(
+                        "\n Enter the higher cutoff frequency (Hz). "
+                        "If you do not want to apply a low pass filter "
+                        "or band pass filter, just press enter. \n",
+                        [int, float],
                     )
-                    tmp_params["desired_sampling_rate"] = desired_sampling_rate
+                    if lowcut in _EMPTY_OPTIONS and highcut in _EMPTY_OPTIONS:
+                        print(
+                            "**Please enter either the filter lower cutoff frequency "
+                            "and/or the filter higher cutoff frequency"
+                        )
+                    else:
+                        break
+                if lowcut not in _EMPTY_OPTIONS:
+                    tmp_params["lowcut"] = lowcut
+                if highcut not in _EMPTY_OPTIONS:
+                    tmp_params["highcut"] = highcut
+            if method in ["savgol", "butterworth", "bessel"]:
+                tmp_params["order"] = _ask(
+                    "\n Enter the filter order. Must be a positive integer.\n", int
+                )
+            if method == "savgol":
+                tmp_params["window_size"] = _ask(
+                    "\n Enter the length of the filter window. Must be an odd "
+                    "integer.\n",
+                    "odd",
+                )
+        if step == "signal_resample":
+            tmp_params["desired_sampling_rate"] = _ask(
+                "\n Enter the desired sampling frequency "
+                "to resample the signal (in Hz). \n",
+                [int, float],
+            )
 
-            tmp["parameters"] = tmp_params
+        tmp["parameters"] = tmp_params
 
-            if step in ["filtering", "filter", "signal_resample"]:
-                while ref is False:
-                    ref = input("\n Is there a reference related to that step ? [y/n] \n")
-                    ref = _check_input_validity(ref, ["y", "n"], empty=False)
-                if ref == "y":
-                    tmp["reference"] = _create_ref()
-                steps.append(tmp)
-        else:
-            print("\n---Saving configuration file---")
-            with open(os.path.join(outdir, filename), "w") as f:
-                json.dump(steps, f, indent=4)
-            break
+        ref = _ask_yes_no(
+            "\n Is there a reference related to that step ? [y/n] \n", empty=False
+        )
+        if ref == "y":
+            tmp["reference"] = _create_ref()
+        steps.append(tmp)
+
+    return filename
+
+
+def _list_strategies(preset_path):
+    # List the strategy presets shipped with physprep, whatever the working directory
+    directory = resource_filename("physprep", f"data/{preset_path}")
+    return [
+        entry.name.rsplit(".", 1)[0]
+        for entry in os.scandir(directory)
+        if entry.is_file() and not entry.name.startswith(".")
+    ]
 
 
 def create_config_workflow(outdir, filename, overwrite=False):
@@ -644,62 +744,25 @@ def create_config_workflow(outdir, filename, overwrite=False):
         "trigger",
         "TTL",
     ]
-    preprocessing_strategy = [
-        os.path.splitext(f)[0]
-        for f in os.listdir("./physprep/data/preprocessing_strategy/")
-    ]
-    preprocessing_strategy.append("new")
-
-    qa_strategy = [
-        os.path.splitext(f)[0] for f in os.listdir("./physprep/data/qa_strategy/")
-    ]
-    qa_strategy.append("new")
+    # Format the available strategies once, they are listed in every prompt
+    preprocessing_strategy = ", ".join(_list_strategies("preprocessing_strategy"))
+    qa_strategy = ", ".join(_list_strategies("qa_strategy"))
 
     filename = _check_filename(outdir, filename, extension=".json", overwrite=overwrite)
+    filepath = _resolve_path(outdir, filename)
 
     while True:
-        signal = preprocessing = qa = False
-        while signal is False:
-            signal = input(
-                "\n Enter the type of signal to process. Currently only the (pre-)"
-                f"processing of {', '.join(valid_signals)}. \nIf you do not want to add "
-                "another type of signal, just press enter.\n"
-            )
-            signal = _check_input_validity(signal, valid_signals, empty=True)
+        preprocessing = qa = False
+        signal = _ask(
+            "\n Enter the type of signal to process. Currently only the (pre-)"
+            f"processing of {', '.join(valid_signals)}. \nIf you do not want to add "
+            "another type of signal, just press enter.\n",
+            valid_signals,
+        )
 
-        if signal not in ["", " "]:
-            signals[signal] = {}
+        if signal not in _EMPTY_OPTIONS:
             # Associate abbreviation to the signal type
-            if signal in ["PPG", "cardiac_ppg"]:
-                signals[signal] = {
-                    "id": "PPG",
-                    "Description": "continuous pulse measurement",
-                    "Units": "V",
-                }
-            elif signal in ["ECG", "cardiac_ecg"]:
-                signals[signal] = {
-                    "id": "ECG",
-                    "Description": "continuous electrocardiogram measurement",
-                    "Units": "mV",
-                }
-            elif signal in ["EDA", "GSR", "electrodermal"]:
-                signals[signal] = {
-                    "id": "EDA",
-                    "Description": "continuous electrodermal measurement",
-                    "Units": "microsiemens",
-                }
-            elif signal in ["RSP", "RESP", "respiratory"]:
-                signals[signal] = {
-                    "id": "RESP",
-                    "Description": "continuous breathing measurement",
-                    "Units": "cm H2O",
-                }
-            elif signal == "trigger":
-                signals[signal] = {
-                    "id": "TTL",
-                    "Description": "continuous measurement of the scanner trigger signal",
-                    "Units": "V",
-                }
+            signals[signal] = dict(_SIGNAL_META.get(signal, {}))
 
             # Ask for the channel name associated with the signal
             channel = input(
@@ -718,7 +781,7 @@ def create_config_workflow(outdir, filename, overwrite=False):
                         "strategy, \nspecify the path to an existing file, "
                         "or create a new configuration file. To create a "
                         "new configuration file type `new`.\n Otherwise, choose among "
-                        f"those strategy: {', '.join(preprocessing_strategy[:-1])}.\n"
+                        f"those strategy: {preprocessing_strategy}.\n"
                     )
 
                 if preprocessing == "new":
@@ -727,14 +790,9 @@ def create_config_workflow(outdir, filename, overwrite=False):
                         "strategy. The given name will be used as the name of the json "
                         "file.\n"
                     )
-                    filename_preprocessing = _check_filename(
-                        outdir,
-                        filename_preprocessing,
-                        extension=".json",
-                        overwrite=overwrite,
-                    )
-                    # Create the preprocessing configuration file
-                    create_config_preprocessing(
+                    # Create the preprocessing configuration file, the filename is
+                    # validated there
+                    filename_preprocessing = create_config_preprocessing(
                         outdir, filename_preprocessing, overwrite=overwrite
                     )
                     # Add preprocessing config file directory to the workflow config file
@@ -770,7 +828,7 @@ def create_config_workflow(outdir, filename, overwrite=False):
                         "strategy, \nspecify the path to an existing file, "
                         "or create a new configuration file. To create a "
                         "new configuration file type `new`.\n Otherwise, choose among "
-                        f"those strategy: {', '.join(qa_strategy[:-1])}.\n"
+                        f"those strategy: {qa_strategy}.\n"
                     )
 
                 if qa == "new":
@@ -779,14 +837,16 @@ def create_config_workflow(outdir, filename, overwrite=False):
                         "strategy. The given name will be used as the name of the json "
                         "file.\n"
                     )
-                    filename_qa = _check_filename(
+                    # Create the qa configuration file, the filename is validated
+                    # there. The respiratory signal id is RESP, but its qa modality
+                    # is RSP
+                    modality = signals[signal]["id"]
+                    filename_qa = create_config_qa(
                         outdir,
                         filename_qa,
-                        extension=".json",
+                        "RSP" if modality == "RESP" else modality,
                         overwrite=overwrite,
                     )
-                    # Create the qa configuration file
-                    create_config_qa(outdir, filename_qa, overwrite=overwrite)
                     # Add qa config file directory to the workflow config file
                     signals[signal].update(
                         {"qa_strategy": os.path.join(outdir, filename_qa)}
@@ -806,8 +866,8 @@ def create_config_workflow(outdir, filename, overwrite=False):
             # Save the configuration file only if there is at least one signal
             if bool(signals):
                 print("\n---Saving configuration file---")
-                with open(os.path.join(outdir, filename), "w") as f:
-                    json.dump(signals, f, indent=4)
+                with open(filepath, "w") as f:
+                    f.write(json.dumps(signals, indent=4))
             break
 
 
@@ -884,21 +944,22 @@ def rename_in_bids(data):
     # If the data is a DataFrame, rename the columns according to the snake_case
     # convention
     bids_names = {}
-    names = data.columns if isinstance(data, pd.DataFrame) else data
     if isinstance(data, pd.DataFrame):
-        # Rename columns following BIDS convention for tabular files
-
-        for col in names:
-            col_snake = re.sub("(.)([A-Z][a-z]+)", r"\1_\2", col)
+        # Rename columns following BIDS convention for tabular files, using the
+        # vectorized string methods of the columns Index
+        data.columns = (
+            data.columns.str.replace(_CAPITALIZED_WORD_RE, r"\1_\2", regex=True)
             # Deal with multiple consecutive uppercase letters
-            col_snake = re.sub("([a-z0-9])([A-Z])", r"\1_\2", col_snake).lower()
-            col_snake = col_snake.replace("__", "_")
-            bids_names.update({col: col_snake})
+            .str.replace(_LOWER_UPPER_RE, r"\1_\2", regex=True)
+            .str.lower()
+            .str.replace("__", "_", regex=False)
+        )
+        return data
 
     # If the data is a dictionary, rename the keys according to the CamelCase convention
     elif isinstance(data, dict):
         # Rename keys following BIDS convention for Key-value files
-        for k in names:
+        for k in data:
             if _is_camel_case(k):
                 if k[0].lower() == k[0]:
                     bids_names.update({k: k[0].upper() + k[1:]})
@@ -909,10 +970,8 @@ def rename_in_bids(data):
                 key_camel = "".join(map(str.capitalize, key_camel))
                 bids_names.update({k: key_camel})
 
-    # Rename columns/keys
-    if isinstance(data, pd.DataFrame):
-        data.rename(columns=bids_names, inplace=True)
-    elif isinstance(data, dict):
+    # Rename keys
+    if isinstance(data, dict):
         data = dict((bids_names[k], v) for (k, v) in data.items())
 
     return data
@@ -925,10 +984,8 @@ def _is_camel_case(input):
     input: str
         Input string to check.
     """
-    pattern = r"^[a-zA-Z][a-zA-Z0-9]*$"
-
     # Use re.match to see if the entire string matches the pattern
-    return bool(re.match(pattern, input))
+    return bool(_CAMEL_CASE_RE.match(input))
 
 
 def create_scans_file_eeg(path, sub, ses, overwrite=False):
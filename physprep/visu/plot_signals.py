@@ -24,23 +24,51 @@ output_notebook()
 
 def load_data(outdir, sub, ses):
     path = os.path.join(outdir, sub, ses)
-    files = [
-        f.split(".")[0] for f in os.listdir(path) if "tsv.gz" in f and "noseq" not in f
-    ]
-    files.sort()
+    # `DirEntry.is_file` uses the information gathered while scanning the directory,
+    # so no extra stat call is made per file
+    with os.scandir(path) as entries:
+        files = sorted(
+            entry.name.split(".")[0]
+            for entry in entries
+            if entry.is_file()
+            and entry.name.endswith(".tsv.gz")
+            and "noseq" not in entry.name
+        )
 
     data, data_noseq, info = [], [], []
     for f in files:
         print(f)
-        data.append(pd.read_csv(os.path.join(outdir, sub, ses, f + ".tsv.gz"), sep="\t"))
-        data_noseq.append(
-            pd.read_csv(os.path.join(outdir, sub, ses, f + "_noseq.tsv.gz"), sep="\t")
-        )
-        info.append(load_json(os.path.join(outdir, sub, ses, f + ".json")))
+        # The sidecars are kept per run, as the runs can differ in their metadata
+        data.append(pd.read_csv(os.path.join(path, f + ".tsv.gz"), sep="\t"))
+        data_noseq.append(pd.read_csv(os.path.join(path, f + "_noseq.tsv.gz"), sep="\t"))
+        info.append(load_json(os.path.join(path, f + ".json")))
 
     return data, data_noseq, files, info
 
 
+def _peaks_mask(indices, length):
+    """
+    Mark the samples at `indices` in a boolean vector of size `length`.
+
+    Parameters
+    ----------
+    indices : list or array
+        Sample indices of the events (e.g. peaks, onsets).
+    length : int
+        Length of the timeseries.
+
+    Returns
+    -------
+    mask : array
+        Boolean vector, True at the samples listed in `indices`.
+    """
+    indices = np.asarray(indices, dtype=float)
+    indices = indices[~np.isnan(indices)].astype(int)
+    mask = np.zeros(length, dtype=bool)
+    mask[indices[(indices >= 0) & (indices < length)]] = True
+    return mask
+
+
 def plot_scr(
     signal: np.ndarray = None,
     peaks: np.ndarray = None,
@@ -356,13 +384,14 @@ def generate_plot(data, features, metadata, modality):
         sampling_frequency = metadata['SamplingFrequency']
 
     try:
+        n_samples = len(data[f"{modality}_clean"])
         # Plot cleaned signal during MRI sequence
         if modality.lower() in ["respiratory", "rsp", "resp"]:
-            peaks = [1 if idx in features[modality]["inhale_max"] else 0 for idx, i in enumerate([0]*len(data[f"{modality}_clean"]))]
+            peaks = _peaks_mask(features[modality]["inhale_max"], n_samples)
 
             figure_signal = plot_raw(
                 signal=data[f"{modality}_clean"],
-                peaks=np.array(peaks).astype(bool),
+                peaks=peaks,
                 sfreq=sampling_frequency,
                 modality=modality,
                 title=f"{modality} : Scanner on - Clean",
@@ -370,15 +399,15 @@ def generate_plot(data, features, metadata, modality):
                 show_artefacts=True,
             )
         elif modality.lower() in ["electrodermal", "eda", "gsr"]:
-            peaks = [1 if idx in features[modality]["scr_peak"] else 0 for idx, i in enumerate([0]*len(data[f"{modality}_clean"]))]
-            onsets = [1 if idx in features[modality]["scr_onset"] else 0 for idx, i in enumerate([0]*len(data[f"{modality}_clean"]))]
+            peaks = _peaks_mask(features[modality]["scr_peak"], n_samples)
+            onsets = _peaks_mask(features[modality]["scr_onset"], n_samples)
             if f"{modality}_phasic" in data.keys():
                 figure_signal = plot_raw(
                     signal=data[f"{modality}_clean"],
                     eda_scr=data[f"{modality}_phasic"],
                     eda_scl=data[f"{modality}_tonic"],
-                    peaks=np.array(peaks).astype(bool),
-                    onsets=np.array(onsets).astype(bool),
+                    peaks=peaks,
+                    onsets=onsets,
                     sfreq=sampling_frequency,
                     modality=modality,
                     title=f"{modality} : Scanner on - Clean",
@@ -388,8 +417,8 @@ def generate_plot(data, features, metadata, modality):
             else:
                 figure_signal = plot_raw(
                     signal=data[f"{modality}_clean"],
-                    peaks=np.array(peaks).astype(bool),
-                    onsets=np.array(onsets).astype(bool),
+                    peaks=peaks,
+                    onsets=onsets,
                     sfreq=sampling_frequency,
                     modality=modality,
                     title=f"{modality} : Scanner on - Clean",
@@ -398,11 +427,11 @@ def generate_plot(data, features, metadata, modality):
                 )
         elif modality.lower() in ["cardiac", "ecg", "ppg"]:
             peak_key = [key for key in features[modality].keys() if 'peak_corrected' in key][0]
-            peaks = [1 if idx in features[modality][peak_key] else 0 for idx, i in enumerate([0]*len(data[f"{modality}_clean"]))]
+            peaks = _peaks_mask(features[modality][peak_key], n_samples)
 
             figure_signal = plot_raw(
                 signal=data[f"{modality}_clean"],
-                peaks=np.array(peaks).astype(bool),
+                peaks=peaks,
                 sfreq=sampling_frequency,
                 modality=modality.lower(),
                 title=f"{modality} : Scanner on - Clean",
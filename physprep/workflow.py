@@ -5,13 +5,13 @@ Preprocess raw physiological data acquired in MRI, extract features, and generat
 report.
 """
 
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 from pathlib import Path
 
 import click
 
 from physprep import utils
-from physprep.processing import clean, process
-from physprep.quality import qa, report
+from physprep.processing.run import load_run, process_run
 
 
 @click.command()
@@ -26,20 +26,22 @@ from physprep.quality import qa, report
 @click.option(
     "--sub",
     type=str,
-    default=None,
+    multiple=True,
     required=False,
     help="Subject id. Use only to process the data of that specific subject. "
-    "For example: if you specify --sub 01, only sub-01 data will be processed.",
+    "For example: if you specify --sub 01, only sub-01 data will be processed. "
+    "Can be repeated to process several subjects (e.g. --sub 01 --sub 02).",
 )
 @click.option(
     "--ses",
     type=str,
-    default=None,
+    multiple=True,
     required=False,
     help="Session label. Use only to process the data of that specific session. "
     "For example: if you specify --ses 001, only data from ses-001 will be "
     "processed. If specify, but --sub not specified, data from the specified "
-    "session (e.g. ses-001) across all subjects will be processed.",
+    "session (e.g. ses-001) across all subjects will be processed. Can be repeated "
+    "to process several sessions.",
 )
 @click.option(
     "--derivatives_dir",
@@ -52,6 +54,13 @@ from physprep.quality import qa, report
     is_flag=True,
     help="If specified, an quality report will be generated and saved for each run.",
 )
+@click.option(
+    "--n_jobs",
+    type=click.IntRange(min=1),
+    default=1,
+    help="Number of runs processed in parallel. If only one run is processed, number "
+    "of signal types whose features are extracted in parallel. Default to 1.",
+)
 def main(
     workflow_strategy,
     indir_bids,
@@ -59,6 +68,7 @@ def main(
     ses=None,
     derivatives_dir=None,
     save_report=False,
+    n_jobs=1,
 ):
     """Physprep workflow.
 
@@ -81,13 +91,13 @@ def main(
 
         Path to the directory containing the BIDS-like dataset.
 
-    sub : str, optional
+    sub : str or list of str, optional
 
-        Subject id. E.g. '01'
+        Subject id(s). E.g. '01'
 
-    ses : str, optional
+    ses : str or list of str, optional
 
-        Session id, by default `None`. E.g. '001'
+        Session id(s), by default `None`. E.g. '001'
 
     indir_raw_physio : str or pathlib.Path
 
@@ -104,6 +114,13 @@ def main(
 
         If specified, an quality report will be generated and saved for each run.
 
+    n_jobs : int, optional
+
+        Number of runs processed in parallel, by default 1 (i.e., sequentially). If
+        only one run is processed, the features of its signal types are extracted in
+        parallel instead. The two levels are never combined, so at most `n_jobs`
+        worker processes are used.
+
     """
     # Set up directories
     # Check if directories exist
@@ -127,9 +144,9 @@ def main(
     # Change to iterate through files and not sessions + files by using BIDSLayout:
     # Defines parameters to get the physio files
     info_layout = {"extension": "tsv.gz", "suffix": "physio"}
-    if sub is not None:
+    if sub:
         info_layout["subject"] = utils._check_sub_validity(sub, layout.get_subjects())
-    if ses is not None:
+    if ses:
         info_layout["session"] = utils._check_ses_validity(ses, layout.get_sessions())
     # Get directory for files containing physio timeseries
     files = layout.get(**info_layout)
@@ -140,63 +157,34 @@ def main(
             "and if applicable the correct values for `sub` and/or `ses`."
         )
 
-    for file in files:
-        # Load metada
-        metadata = file.get_metadata()
-        if not bool(metadata):
-            raise FileNotFoundError(f"No metadata file associated with {file}.")
-        # Load data
-        print(f"\nLoading {file}...\n")
-        data = file.get_df()
-        print("Data loaded.\n")
-
-        # Preprocess data
-        print("Preprocessing data...\n")
-        preprocessed_signals, metadata_derivatives = clean.preprocessing_workflow(
-            data, metadata, workflow
-        )
-        print("Saving preprocessed signals...\n")
-        utils.save_processing(
-            derivatives_dir,
-            file.get_entities(),
-            "preproc",
-            preprocessed_signals,
-            metadata_derivatives,
-        )
-        print("Preprocessing done.\n")
-
-        # Extract features
-        print("Extracting features...\n")
-        features, events = process.features_extraction_workflow(
-            preprocessed_signals, metadata_derivatives, workflow
-        )
-        print("Saving extracted features...\n")
-        utils.save_features(derivatives_dir, file.get_entities(), events)
-        print("Features extraction done.\n")
-
-        # Generate quality report
-        print("Assessing quality of the data...\n")
-        qa_metrics, qa_short = qa.computing_sqi(
-            workflow, preprocessed_signals, features, metadata_derivatives
-        )
-        print("Saving quality assessment...\n")
-        utils.save_qa(derivatives_dir, file.get_entities(), qa_metrics)
-        utils.save_qa(derivatives_dir, file.get_entities(), qa_short, short=True)
-        print("Data quality assessed.\n")
-
-        if save_report:
-            print("Generating QC report... \n")
-            qa_report = report.generate_report(
-                workflow,
-                qa_metrics,
-                preprocessed_signals,
-                features,
-                metadata_derivatives,
-                derivatives_dir,
-                file.get_entities(),
+    if n_jobs == 1 or len(files) == 1:
+        for file in files:
+            process_run(
+                *load_run(file), workflow, derivatives_dir, save_report, n_jobs=n_jobs
             )
-            print("QC report generated. \n")
-            utils.save_qa(derivatives_dir, file.get_entities(), qa_report, report=True)
+    else:
+        # Make sure the derivatives dataset is initialized before the workers save in it
+        utils._check_bids_validity(derivatives_dir, is_derivative=True)
+        # The runs are independent, so they can be processed in separate processes. At
+        # most `n_jobs` runs are loaded in memory at the same time.
+        with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+            pending = set()
+            for file in files:
+                if len(pending) >= n_jobs:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        future.result()
+                pending.add(
+                    executor.submit(
+                        process_run,
+                        *load_run(file),
+                        workflow,
+                        derivatives_dir,
+                        save_report,
+                    )
+                )
+            for future in pending:
+                future.result()
 
 
 if __name__ == "__main__":